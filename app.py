@@ -1,10 +1,13 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import string
 from collections import deque
 import concurrent.futures
 import logging
 from datetime import datetime
+from response_cache import ResponseCache
+from rate_limiter import RateLimiter
 
 # Configure logging
 logging.basicConfig(
@@ -17,99 +20,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-BASE_URL = "http://35.200.185.69:8000/v1/autocomplete"
+API_VERSION = "v1"
+BASE_URL = f"http://35.200.185.69:8000/{API_VERSION}/autocomplete"
 RATE_LIMIT = 100  # 100 requests per minute
 MAX_RETRIES = 5
+BACKOFF = tuple(2 ** attempt for attempt in range(MAX_RETRIES))  # Seconds to wait after each failed attempt
 MAX_WORKERS = 20  # Adjust based on API's concurrency tolerance
 
-class RateLimiter:
-    def __init__(self, limit, window):
-        self.limit = limit  # Number of requests allowed
-        self.window = window  # Time window in seconds
-        self.timestamps = deque()
-        
-    def add_request(self):
-        now = time.time()
-        
-        # Remove timestamps older than the window
-        while self.timestamps and self.timestamps[0] < now - self.window:
-            self.timestamps.popleft()
-        
-        # Add current timestamp
-        self.timestamps.append(now)
-    
-    def wait_if_needed(self):
-        if len(self.timestamps) < self.limit:
-            return 0
-        
-        # If we've reached the limit, calculate how long to wait
-        now = time.time()
-        oldest = self.timestamps[0]
-        wait_time = max(0, self.window - (now - oldest))
-        
-        if wait_time > 0:
-            time.sleep(wait_time)
-            return wait_time
-        return 0
+# Shared session so worker threads reuse keep-alive connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=0)
+SESSION.mount("http://", _adapter)
+
+# Responses persisted across runs so restarts don't re-spend the rate limit
+CACHE = ResponseCache()
 
 def make_api_request(query, rate_limiter):
+    cached = CACHE.get(API_VERSION, query)
+    if cached is not None:
+        return cached
+    
+    # Local aliases for the retry loop
+    _sleep = time.sleep
+    _get = SESSION.get
+    _log_err = logger.error
+    
     for attempt in range(MAX_RETRIES):
-        # Wait if we're approaching rate limit
-        rate_limiter.wait_if_needed()
+        # Wait for a token from the rate limiter
+        rate_limiter.acquire()
         
         try:
-            response = requests.get(f"{BASE_URL}?query={query}")
-            rate_limiter.add_request()
+            response = _get(BASE_URL, params={"query": query}, timeout=10)
             
             if response.status_code == 200:
-                return response.json()
+                data = response.json()
+                CACHE.set(API_VERSION, query, data)
+                return data
             elif response.status_code == 429:  # Rate limit exceeded
                 wait_time = 60 * (attempt + 1)  # Wait longer with each retry
                 logger.warning(f"Rate limit exceeded for query '{query}'. Waiting {wait_time}s")
-                time.sleep(wait_time)
+                _sleep(wait_time)
             else:
-                logger.error(f"Error: Status code {response.status_code} for query '{query}'")
+                _log_err(f"Error: Status code {response.status_code} for query '{query}'")
                 if attempt < MAX_RETRIES - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    _sleep(BACKOFF[attempt])  # Exponential backoff
                 
         except requests.RequestException as e:
-            logger.error(f"Request failed for query '{query}': {e}")
+            _log_err(f"Request failed for query '{query}': {e}")
             if attempt < MAX_RETRIES - 1:
-                time.sleep(2 ** attempt)  # Exponential backoff
+                _sleep(BACKOFF[attempt])  # Exponential backoff
     
-    logger.error(f"All retries failed for query '{query}'")
+    _log_err(f"All retries failed for query '{query}'")
     return None
 
+def child_prefixes(prefix, results):
+    """Return the deeper prefixes still worth querying after a full page of results.
+    
+    The API returns matches in lexicographic order, so every name whose next
+    character sorts before the last returned one has already been seen; only
+    that last branch and the ones after it can hold names we haven't fetched.
+    """
+    next_chars = {name[len(prefix)] for name in results
+                  if len(name) > len(prefix) and name.startswith(prefix)}
+    if not next_chars:
+        return [prefix + char for char in string.ascii_lowercase]
+    
+    last_char = max(next_chars)
+    return [prefix + char for char in string.ascii_lowercase if char >= last_char]
+
 def bfs_explore():
     rate_limiter = RateLimiter(RATE_LIMIT, 60)  # 100 requests per 60 seconds
     queue = deque(string.ascii_lowercase)
     all_names = set()
-    processed = set()
-    request_count = 0
+    prefix_count = 0
+    cache_hits_before = CACHE.hits
+    completed = 0
     
     with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        while queue:
-            # Take up to MAX_WORKERS prefixes from the queue
-            current_batch = []
-            for _ in range(min(MAX_WORKERS, len(queue))):
-                if queue:
-                    prefix = queue.popleft()
-                    if prefix not in processed:
-                        current_batch.append(prefix)
-                        processed.add(prefix)
+        in_flight = {}
+        while queue or in_flight:
+            # Top up to MAX_WORKERS in-flight requests. Each prefix is only ever
+            # enqueued by its parent, so none can come up twice.
+            while queue and len(in_flight) < MAX_WORKERS:
+                prefix = queue.popleft()
+                in_flight[executor.submit(make_api_request, prefix, rate_limiter)] = prefix
+                prefix_count += 1
             
-            if not current_batch:
-                continue
-            
-            # Submit all prefixes in the batch to the executor
-            future_to_prefix = {
-                executor.submit(make_api_request, prefix, rate_limiter): prefix 
-                for prefix in current_batch
-            }
-            request_count += len(current_batch)
-            
-            for future in concurrent.futures.as_completed(future_to_prefix):
-                prefix = future_to_prefix[future]
+            # Handle whatever has finished, then go back to refill the window
+            done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                prefix = in_flight.pop(future)
                 try:
                     response = future.result()
                     if response and "results" in response:
@@ -118,19 +118,19 @@ def bfs_explore():
                         
                         # If we got the maximum number of results, add deeper prefixes to the queue
                         if response.get("count", 0) == 10:
-                            for char in string.ascii_lowercase:
-                                new_prefix = prefix + char
-                                if new_prefix not in processed:
-                                    queue.append(new_prefix)
-                        
-                        # Log progress periodically
-                        if len(all_names) % 100 == 0:
-                            logger.info(f"Found {len(all_names)} unique names so far. Queue size: {len(queue)}")
+                            queue.extend(child_prefixes(prefix, results))
                             
                 except Exception as exc:
                     logger.error(f"Error processing '{prefix}': {exc}")
+                
+                # Log progress every 100 completed requests, failed ones included
+                completed += 1
+                if completed % 100 == 0:
+                    logger.info(f"Found {len(all_names)} unique names so far. Queue size: {len(queue)}")
     
-    return all_names, request_count
+    # Prefixes answered from the on-disk cache never reached the API
+    cache_hits = CACHE.hits - cache_hits_before
+    return all_names, prefix_count - cache_hits, cache_hits
 
 def save_checkpoint(names, filename="checkpoint.txt"):
     """Save current results to a checkpoint file"""
@@ -144,7 +144,7 @@ if __name__ == "__main__":
     logger.info("Starting autocomplete extraction")
     
     try:
-        all_names, request_count = bfs_explore()
+        all_names, request_count, cache_hits = bfs_explore()
         
         end_time = time.time()
         duration = end_time - start_time
@@ -152,6 +152,7 @@ if __name__ == "__main__":
         logger.info(f"Extraction completed in {duration:.2f} seconds")
         logger.info(f"Total names found: {len(all_names)}")
         logger.info(f"Total API requests made: {request_count}")
+        logger.info(f"Prefixes served from cache: {cache_hits}")
         
         # Save results to file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
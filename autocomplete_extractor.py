@@ -5,11 +5,59 @@ import logging
 from collections import deque
 import time
 import string
+import itertools
 import argparse
+import os
+import random
+from response_cache import ResponseCache
+from rate_limiter import AsyncRateLimiter
+
+# orjson is optional; it serializes the large name lists much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+NAMES_LOG = '{version}_names.jsonl'  # Append-only log of discovered names
+LOG_EVERY = 100  # Queries between progress log lines
+MAX_WORKERS = 20  # Concurrent in-flight requests
+RATE_LIMIT = 100  # 100 requests per minute
+RATE_WINDOW = 60
+MAX_RETRIES = 5
+
+def backoff(attempt: int) -> float:
+    """Jittered exponential delay so retrying tasks don't all wake together"""
+    return min(60, 2 ** attempt) + random.random()
+
+def retry_after(headers):
+    """Seconds to back off after a 429 from the response headers, or None"""
+    for header in ("Retry-After", "X-RateLimit-Reset"):
+        try:
+            value = float(headers.get(header))
+        except (TypeError, ValueError):
+            continue
+        # X-RateLimit-Reset is sometimes an epoch timestamp rather than a delay
+        if value > time.time() / 2:
+            value -= time.time()
+        return max(0.0, value)
+    return None
+
+def load_json(raw: bytes):
+    """Parse a JSON response body"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def write_json(path: str, data):
+    """Write data to path as indented JSON"""
+    if orjson:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
 class AutocompleteExplorer:
     def __init__(self, base_url):
         self.base_url = base_url
@@ -18,127 +66,235 @@ class AutocompleteExplorer:
         self.v2_names = set()
         self.v3_names = set()
         self.requests_count = {'v1': 0, 'v2': 0, 'v3': 0}
+        self.retries_count = {'v1': 0, 'v2': 0, 'v3': 0}
+        self.queries_done = {'v1': 0, 'v2': 0, 'v3': 0}
+        self.cache = ResponseCache()
+        # In-memory memo of successful results in front of the on-disk cache
+        self.result_cache = {}
+        self.semaphore = asyncio.Semaphore(MAX_WORKERS)
+        self.limiter = AsyncRateLimiter(RATE_LIMIT, RATE_WINDOW)
+        self.names_logs = {}
         
     async def init_session(self):
-        self.session = aiohttp.ClientSession()
+        # Non-blocking DNS via c-ares when aiodns is installed
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except RuntimeError:
+            resolver = None
+        
+        # Single API host: keep a small pool of long-lived connections to it
+        connector = aiohttp.TCPConnector(
+            resolver=resolver,
+            limit=MAX_WORKERS,
+            limit_per_host=MAX_WORKERS,
+            ttl_dns_cache=600,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=15)
+        )
 
     async def close_session(self):
         if self.session:
             await self.session.close()
+        self.cache.close()
+        for names_log in self.names_logs.values():
+            names_log.close()
 
     async def make_request(self, version: str, query: str) -> list:
         """Make a request to specific API version"""
-        self.requests_count[version] += 1
+        key = (version, query)
+        if key in self.result_cache:
+            return self.result_cache[key]
         
-        try:
-            url = f"{self.base_url}/{version}/autocomplete"
-            async with self.session.get(url, params={"query": query}) as response:
-                if response.status == 429:
-                    logger.warning(f"Rate limit hit for {version}, waiting...")
-                    await asyncio.sleep(61)
-                    return await self.make_request(version, query)
-                    
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get("results", [])
+        cached = self.cache.get(version, query)
+        if cached is not None:
+            results = self.result_cache[key] = cached.get("results", [])
+            return results
+        
+        self.requests_count[version] += 1
+        url = f"{self.base_url}/{version}/autocomplete"
+        for attempt in range(MAX_RETRIES):
+            if attempt:
+                self.retries_count[version] += 1
+            await self.limiter.acquire()
+            
+            try:
+                async with self.session.get(url, params={"query": query}) as response:
+                    if response.status == 429:
+                        wait_time = retry_after(response.headers)
+                        if wait_time is not None:
+                            logger.warning(f"Rate limit hit for {version}, waiting {wait_time:.0f}s...")
+                            # Pause the shared limiter so other tasks back off too
+                            self.limiter.pause(wait_time)
+                        else:
+                            wait_time = backoff(attempt)
+                            logger.warning(f"Rate limit hit for {version}, retrying in {wait_time:.1f}s...")
+                            await asyncio.sleep(wait_time)
+                        continue
+                        
+                    if response.status == 200:
+                        data = load_json(await response.read())
+                        self.cache.set(version, query, data)
+                        results = self.result_cache[key] = data.get("results", [])
+                        return results
+                        
+                    logger.error(f"Error {response.status} for {version}: {await response.text()}")
+                    return []
                     
-                logger.error(f"Error {response.status} for {version}: {await response.text()}")
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                if attempt < MAX_RETRIES - 1:
+                    wait_time = backoff(attempt)
+                    logger.warning(f"Request failed for {version} query '{query}': {e!r}, retrying in {wait_time:.1f}s...")
+                    await asyncio.sleep(wait_time)
+                continue
+            except Exception as e:
+                logger.error(f"Request failed for {version}: {str(e)}")
                 return []
-                
-        except Exception as e:
-            logger.error(f"Request failed for {version}: {str(e)}")
-            return []
+        
+        logger.error(f"All retries failed for {version} query '{query}'")
+        return []
+
+    async def query_all(self, version: str, queries, label: str) -> list:
+        """Run queries concurrently, at most MAX_WORKERS in flight"""
+        async def _q(query):
+            async with self.semaphore:
+                results = await self.make_request(version, query)
+            logger.debug("%s %s '%s': found %d names", version.upper(), label, query, len(results))
+            self.queries_done[version] += 1
+            if self.queries_done[version] % LOG_EVERY == 0:
+                logger.info("%s progress: %d queries", version.upper(), self.queries_done[version])
+            return query, results
+        
+        results = await asyncio.gather(*[_q(query) for query in queries])
+        
+        # Record the phase's names in one pass once every query is back
+        self.add_names(version, [name for _, names in results for name in names])
+        self.save_progress(version)
+        logger.info("%s %s: %d queries, %d unique names so far",
+                    version.upper(), label, len(results), len(getattr(self, f'{version}_names')))
+        return results
 
     async def explore_v1(self):
         """Explore v1 with single and double letter combinations"""
         logger.info("Starting v1 exploration")
+        self.load_names_log('v1')
+        
+        chars = string.ascii_lowercase
         
         # Try single letters
-        for letter in string.ascii_lowercase:
-            results = await self.make_request('v1', letter)
-            self.v1_names.update(results)
-            logger.info(f"V1 single letter '{letter}': found {len(results)} names")
-            self.save_progress('v1')
+        await self.query_all('v1', chars, "single letter")
             
         # Try two letter combinations
-        for first in string.ascii_lowercase:
-            for second in string.ascii_lowercase:
-                query = first + second
-                results = await self.make_request('v1', query)
-                self.v1_names.update(results)
-                logger.info(f"V1 two letters '{query}': found {len(results)} names")
-                self.save_progress('v1')
+        await self.query_all('v1', [first + second for first, second in itertools.product(chars, chars)], "two letters")
         
+        self.save_results('v1')
         logger.info("=== V1 Final Statistics ===")
-        logger.info(f"V1 total requests made: {self.requests_count['v1']}")
+        logger.info(f"V1 total requests made: {self.requests_count['v1']} (+{self.retries_count['v1']} retries)")
         logger.info(f"V1 total unique names found: {len(self.v1_names)}")
 
     async def explore_v2(self):
         """Explore v2 with single letters/numbers and two character combinations"""
         logger.info("Starting v2 exploration")
+        self.load_names_log('v2')
         
         # Characters to try (letters + numbers)
         chars = string.ascii_lowercase + string.digits
         
         # Try single characters
-        for char in chars:
-            results = await self.make_request('v2', char)
-            self.v2_names.update(results)
-            logger.info(f"V2 single char '{char}': found {len(results)} names")
-            self.save_progress('v2')
+        await self.query_all('v2', chars, "single char")
             
         # Try two character combinations
-        for first in chars:
-            for second in chars:
-                query = first + second
-                results = await self.make_request('v2', query)
-                self.v2_names.update(results)
-                logger.info(f"V2 two chars '{query}': found {len(results)} names")
-                self.save_progress('v2')
+        await self.query_all('v2', [first + second for first, second in itertools.product(chars, chars)], "two chars")
         
+        self.save_results('v2')
         logger.info("=== V2 Final Statistics ===")
-        logger.info(f"V2 total requests made: {self.requests_count['v2']}")
+        logger.info(f"V2 total requests made: {self.requests_count['v2']} (+{self.retries_count['v2']} retries)")
         logger.info(f"V2 total unique names found: {len(self.v2_names)}")
 
     async def explore_v3(self):
         """Explore v3 with all characters including special chars"""
         logger.info("Starting v3 exploration")
+        self.load_names_log('v3')
         
         # All characters including special chars
         chars = string.ascii_lowercase + string.digits + '+- .'
+        specials = frozenset('+- .')
         
         # Try single characters
-        for char in chars:
-            results = await self.make_request('v3', char)
-            self.v3_names.update(results)
-            logger.info(f"V3 single char '{char}': found {len(results)} names")
-            self.save_progress('v3')
+        await self.query_all('v3', chars, "single char")
             
-        # Try two character combinations
-        for first in chars:
-            for second in chars:
-                # Skip invalid combinations of special chars
-                if (first in '+- .' and second in '+- .'):
-                    continue
-                query = first + second
-                results = await self.make_request('v3', query)
-                self.v3_names.update(results)
-                logger.info(f"V3 two chars '{query}': found {len(results)} names")
-                self.save_progress('v3')
+        # Try two character combinations, skipping invalid combinations of special chars
+        queries = [first + second for first, second in itertools.product(chars, chars)
+                   if not (first in specials and second in specials)]
+        await self.query_all('v3', queries, "two chars")
+        
+        self.save_results('v3')
+
+    def load_names_log(self, version: str):
+        """Pick up names logged by an interrupted run and reopen the log for appending"""
+        path = NAMES_LOG.format(version=version)
+        names_set = getattr(self, f'{version}_names')
+        line = ""
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        names_set.add(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Partial last line from an interrupted run
+                        continue
+        
+        names_log = self.names_logs[version] = open(path, 'a')
+        if line and not line.endswith("\n"):
+            # Terminate the partial line so the next name starts on its own
+            names_log.write("\n")
+        return names_log
+
+    def add_names(self, version: str, results: list):
+        """Record newly found names for a version"""
+        names_set = getattr(self, f'{version}_names')
+        new_names = set(results) - names_set
+        if not new_names:
+            return
+        
+        names_set.update(new_names)
+        names_log = self.names_logs.get(version) or self.load_names_log(version)
+        for name in new_names:
+            names_log.write(json.dumps(name) + "\n")
+        names_log.flush()
 
     def save_progress(self, version: str):
-        """Save current progress to file"""
-        with open(f'{version}_results.json', 'w') as f:
-            names_set = getattr(self, f'{version}_names')
-            json.dump({
-                'requests_made': self.requests_count[version],
-                'names_found': len(names_set),
-                'names': sorted(list(names_set))
-            }, f, indent=2)
-
-    def write_all_names_to_file(self, filename="all_explored_names.txt"):
+        """Save current request and name counts; the names are already in the log"""
+        write_json(f'{version}_progress.json', {
+            'requests_made': self.requests_count[version],
+            'names_found': len(getattr(self, f'{version}_names'))
+        })
+
+    def save_results(self, version: str):
+        """Write the final sorted results for a version"""
+        self.save_progress(version)
+        names = sorted(getattr(self, f'{version}_names'))
+        write_json(f'{version}_results.json', {
+            'requests_made': self.requests_count[version],
+            'names_found': len(names),
+            'names': names
+        })
+        
+        # The final file now holds every name, so the run's log is no longer needed
+        names_log = self.names_logs.pop(version, None)
+        if names_log:
+            names_log.close()
+        path = NAMES_LOG.format(version=version)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write_all_names_to_file(self, filename="all_explored_names.txt", all_names=None):
         """Write all explored names to a single file in a clean format"""
-        all_names = sorted(self.v1_names.union(self.v2_names, self.v3_names))
+        if all_names is None:
+            all_names = sorted(self.v1_names | self.v2_names | self.v3_names)
         
         with open(filename, 'w') as f:
             # Write header with statistics
@@ -157,32 +313,30 @@ class AutocompleteExplorer:
         """Run the exploration for all versions"""
         await self.init_session()
         try:
-            await self.explore_v1()
-            await asyncio.sleep(5)
-            await self.explore_v2()
-            await asyncio.sleep(5)
-            await self.explore_v3()
+            # Versions are independent; run them together under the shared rate limit
+            await asyncio.gather(self.explore_v1(), self.explore_v2(), self.explore_v3())
+            
+            all_names = sorted(self.v1_names | self.v2_names | self.v3_names)
             
             # Save combined final results
-            with open('combined_results.json', 'w') as f:
-                json.dump({
-                    'statistics': {
-                        'v1_requests': self.requests_count['v1'],
-                        'v2_requests': self.requests_count['v2'],
-                        'v3_requests': self.requests_count['v3'],
-                        'v1_names_found': len(self.v1_names),
-                        'v2_names_found': len(self.v2_names),
-                        'v3_names_found': len(self.v3_names),
-                        'total_unique_names': len(self.v1_names.union(self.v2_names, self.v3_names))
-                    },
-                    'v1_names': sorted(list(self.v1_names)),
-                    'v2_names': sorted(list(self.v2_names)),
-                    'v3_names': sorted(list(self.v3_names)),
-                    'all_unique_names': sorted(list(self.v1_names.union(self.v2_names, self.v3_names)))
-                }, f, indent=2)
+            write_json('combined_results.json', {
+                'statistics': {
+                    'v1_requests': self.requests_count['v1'],
+                    'v2_requests': self.requests_count['v2'],
+                    'v3_requests': self.requests_count['v3'],
+                    'v1_names_found': len(self.v1_names),
+                    'v2_names_found': len(self.v2_names),
+                    'v3_names_found': len(self.v3_names),
+                    'total_unique_names': len(all_names)
+                },
+                'v1_names': sorted(self.v1_names),
+                'v2_names': sorted(self.v2_names),
+                'v3_names': sorted(self.v3_names),
+                'all_unique_names': all_names
+            })
             
             # Write all names to a clean text file
-            self.write_all_names_to_file()
+            self.write_all_names_to_file(all_names=all_names)
                 
         finally:
             await self.close_session()
@@ -200,11 +354,7 @@ async def main():
     
     try:
         if args.version == 'all':
-            await explorer.explore_v1()
-            await asyncio.sleep(5)
-            await explorer.explore_v2()
-            await asyncio.sleep(5)
-            await explorer.explore_v3()
+            await asyncio.gather(explorer.explore_v1(), explorer.explore_v2(), explorer.explore_v3())
         elif args.version == 'v1':
             await explorer.explore_v1()
         elif args.version == 'v2':
@@ -213,23 +363,22 @@ async def main():
             await explorer.explore_v3()
             
         # Save results for the version(s) explored
-        with open('exploration_results.json', 'w') as f:
-            results = {
-                'statistics': {
-                    'requests': explorer.requests_count,
-                    'names_found': {
-                        'v1': len(explorer.v1_names) if args.version in ['v1', 'all'] else 0,
-                        'v2': len(explorer.v2_names) if args.version in ['v2', 'all'] else 0,
-                        'v3': len(explorer.v3_names) if args.version in ['v3', 'all'] else 0
-                    }
-                },
-                'names': {
-                    'v1': sorted(list(explorer.v1_names)) if args.version in ['v1', 'all'] else [],
-                    'v2': sorted(list(explorer.v2_names)) if args.version in ['v2', 'all'] else [],
-                    'v3': sorted(list(explorer.v3_names)) if args.version in ['v3', 'all'] else []
+        results = {
+            'statistics': {
+                'requests': explorer.requests_count,
+                'names_found': {
+                    'v1': len(explorer.v1_names) if args.version in ['v1', 'all'] else 0,
+                    'v2': len(explorer.v2_names) if args.version in ['v2', 'all'] else 0,
+                    'v3': len(explorer.v3_names) if args.version in ['v3', 'all'] else 0
                 }
+            },
+            'names': {
+                'v1': sorted(explorer.v1_names) if args.version in ['v1', 'all'] else [],
+                'v2': sorted(explorer.v2_names) if args.version in ['v2', 'all'] else [],
+                'v3': sorted(explorer.v3_names) if args.version in ['v3', 'all'] else []
             }
-            json.dump(results, f, indent=2)
+        }
+        write_json('exploration_results.json', results)
         
         # Write all names to a clean text file
         explorer.write_all_names_to_file()
@@ -238,4 +387,10 @@ async def main():
         await explorer.close_session()
 
 if __name__ == "__main__":
+    # uvloop is optional; fall back to the default asyncio loop without it
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+class TokenBucket:
+    """Token bucket allowing at most `limit` requests in any `window` seconds"""
+
+    def __init__(self, limit, window, burst=5):
+        self.limit = limit  # Number of requests allowed
+        self.window = window  # Time window in seconds
+        # A full bucket plus one window of refill must stay within the limit,
+        # so keep the bucket small and refill at what's left of the budget
+        self.burst = min(burst, limit - 1)
+        self.rate = (limit - self.burst) / window  # Tokens refilled per second
+        self.tokens = float(self.burst)
+        self.last = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def reserve(self, now):
+        """Take a token and return how long the caller must wait before using it"""
+        self.refill(now)
+        # A negative balance is the caller's wait
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0
+
+class RateLimiter(TokenBucket):
+    """Thread-safe token bucket for the threaded explorer"""
+
+    def __init__(self, limit, window, burst=5):
+        super().__init__(limit, window, burst)
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            wait_time = self.reserve(time.monotonic())
+
+        # Sleep outside the lock so other threads can queue their reservations
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+class AsyncRateLimiter(TokenBucket):
+    """Token bucket shared by every coroutine that talks to the API"""
+
+    def __init__(self, limit, window, burst=5):
+        super().__init__(limit, window, burst)
+        self.paused_until = 0.0
+        self.shift = 0.0  # Total time pushed back by pauses so far
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            now = time.monotonic()
+            wait_time = max(self.reserve(now), self.paused_until - now)
+            shift = self.shift
+
+        total = 0.0
+        while wait_time > 0:
+            await asyncio.sleep(wait_time)
+            total += wait_time
+            # A pause that started while we slept pushes our slot back by the
+            # same amount, and nobody fires before the pause is over
+            wait_time = max(self.shift - shift, self.paused_until - time.monotonic())
+            shift = self.shift
+        return total
+
+    def pause(self, seconds):
+        """Hold back every caller for the given time, e.g. after a 429"""
+        now = time.monotonic()
+        # Overlapping 429s only extend the pause by however much they add
+        extra = now + seconds - max(self.paused_until, now)
+        if extra <= 0:
+            return
+        self.refill(now)
+        # Keep the debt already owed by pending reservations and add the pause
+        # to it, so callers resume at the refill rate rather than all at once
+        self.tokens -= extra * self.rate
+        self.shift += extra
+        self.paused_until = now + seconds
@@ -0,0 +1,47 @@
+import json
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = "autocomplete_cache.db"
+
+class ResponseCache:
+    """On-disk cache of API responses keyed by (version, query)"""
+
+    def __init__(self, path=CACHE_FILE):
+        # One connection shared by all worker threads; writes go through the lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.hits = 0
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache("
+                "version TEXT, query TEXT, json TEXT, ts REAL, "
+                "PRIMARY KEY(version, query))"
+            )
+            self.conn.commit()
+
+    def get(self, version, query):
+        """Return the cached response for a query, or None on a miss"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT json FROM cache WHERE version = ? AND query = ?",
+                (version, query)
+            ).fetchone()
+            if row:
+                self.hits += 1
+        return json.loads(row[0]) if row else None
+
+    def set(self, version, query, data):
+        """Store a successful response"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache(version, query, json, ts) VALUES (?, ?, ?, ?)",
+                (version, query, json.dumps(data), time.time())
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()